@@ -1,4 +1,5 @@
 import asyncio
+import importlib
 import logging
 import os
 
@@ -81,9 +82,9 @@ if TEST_MODE:
             restart=restart,
         )
 
-# import all submodules
-# Import all problem modules to ensure problems are registered
-import_submodules(hud_controller.problems)
+# problem specs by id, so lookups don't scan the registry. Problem modules are only
+# imported once a spec is asked for (see _get_spec), not when this module loads.
+_SPEC_BY_ID: dict[str, ProblemSpec] = {}
 
 
 # [CUSTOMIZE] Update this template for your project
@@ -114,10 +115,27 @@ def spec_to_statement(spec: ProblemSpec) -> str:
 
 # helper to lookup a problem spec by id
 def _get_spec(problem_id: str) -> ProblemSpec:
-    for spec in PROBLEM_REGISTRY:
-        if spec.id == problem_id:
-            return spec
-    raise ValueError(f"No problem found for id: {problem_id}")
+    if problem_id in _SPEC_BY_ID:
+        return _SPEC_BY_ID[problem_id]
+
+    # try the module named after the problem first, and only import every problem module
+    # if the id cannot be a module name, or that module does not exist or does not register it
+    if problem_id.isidentifier():
+        module_name = f"{hud_controller.problems.__name__}.{problem_id}"
+        try:
+            importlib.import_module(module_name)
+        except ModuleNotFoundError as e:
+            if e.name != module_name:
+                raise
+        _SPEC_BY_ID.update({spec.id: spec for spec in PROBLEM_REGISTRY})
+    if problem_id not in _SPEC_BY_ID:
+        import_submodules(hud_controller.problems)
+        _SPEC_BY_ID.update({spec.id: spec for spec in PROBLEM_REGISTRY})
+
+    try:
+        return _SPEC_BY_ID[problem_id]
+    except KeyError:
+        raise ValueError(f"No problem found for id: {problem_id}") from None
 
 
 # Implementation notes: setup_problem will only be called once per enviroment instance
@@ -128,9 +146,7 @@ async def setup_problem(
     """Starts the enviroment and returns the problem statement"""
     spec = _get_spec(problem_id)
 
-    logger.info(f"=== SETUP_PROBLEM DEBUG ===")
-    logger.info(f"Problem ID: {problem_id}")
-    logger.info(f"Spec: {spec}")
+    logger.debug("Setting up problem %s: %s", problem_id, spec)
 
     # Start the dinit services
     await start_dinit()
@@ -161,7 +177,8 @@ async def grade_problem(
         golden=spec.golden,
     )
 
-    success, result = runner.run_grading()
+    # grading blocks on git/lake subprocesses for minutes; keep the event loop serving other tool calls
+    success, result = await asyncio.to_thread(runner.run_grading)
 
     if success:
         logger.info("Grading successful!")
@@ -208,11 +225,7 @@ async def validate_problem(problem_id: str) -> tuple[bool, dict[str, any]]:
     if not spec.golden:
         raise ValueError(f"Problem {problem_id} missing golden branch/commit")
 
-    logger.info("=== VALIDATE_PROBLEM DEBUG ===")
-    logger.info(f"Problem ID: {problem_id}")
-    logger.info(f"Base: {spec.base}")
-    logger.info(f"Test: {spec.test}")
-    logger.info(f"Golden: {spec.golden}")
+    logger.debug("Validating problem %s (base=%s, test=%s, golden=%s)", problem_id, spec.base, spec.test, spec.golden)
 
     # Create grading runner with the problem's branch/commit info
     runner = GradingRunner(
@@ -221,7 +234,7 @@ async def validate_problem(problem_id: str) -> tuple[bool, dict[str, any]]:
         golden=spec.golden,
     )
 
-    success, result = runner.validate_patches()
+    success, result = await asyncio.to_thread(runner.validate_patches)
 
     if success:
         logger.info("Validation successful!")
@@ -20,9 +20,26 @@ else:
     CHROMIUM_STARTUP_DELAY = 5
 
 
-async def start_dinit():
-    logger.info("Starting dinit")
+# the running service engine, once the boot services have been started
+_engine: SimpleDinit | None = None
+_engine_lock = asyncio.Lock()
+
+
+def _boot() -> SimpleDinit:
     loader = ServiceLoader(Path("/etc/dinit.d"))
     services = loader.load_all()
     engine = SimpleDinit(services)
-    engine.start("boot")
\ No newline at end of file
+    engine.start("boot")
+    return engine
+
+
+async def start_dinit():
+    """Start the boot services once; later calls return immediately."""
+    global _engine
+    async with _engine_lock:
+        if _engine is not None:
+            logger.info("dinit already started")
+            return
+        logger.info("Starting dinit")
+        # service startup runs commands and sleeps; keep it off the event loop
+        _engine = await asyncio.to_thread(_boot)
\ No newline at end of file
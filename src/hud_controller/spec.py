@@ -1,10 +1,9 @@
 import logging
+import math
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from typing import Annotated, Any, Dict, List, Literal, Tuple, Union
 
-import numpy as np
-
 logger = logging.getLogger(__name__)
 
 
@@ -19,13 +18,13 @@ class Grade:
     @property
     def score(self):
         assert self.subscores.keys() == self.weights.keys()
-        assert np.isclose(sum(self.weights.values()), 1)
+        assert math.isclose(sum(self.weights.values()), 1, rel_tol=1e-5, abs_tol=1e-8)
         assert min(self.subscores.values()) >= 0
         assert max(self.subscores.values()) <= 1
 
-        score = sum([self.subscores[key] * self.weights[key] for key in self.subscores.keys()])
+        score = sum(self.subscores[key] * self.weights[key] for key in self.subscores)
 
-        return np.clip(score, 0.0, 1.0)
+        return min(1.0, max(0.0, score))
 
 
 # the different levels of review
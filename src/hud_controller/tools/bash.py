@@ -1,24 +1,88 @@
 import asyncio  # noqa -- swapping to trio would be beneficial, but not blocking atm
 import os
 import tempfile
+import uuid
 
 from .base import CLIResult, ToolError, ToolResult
 
 
+def _decode(data: bytes | bytearray | memoryview) -> str:
+    """Decode shell output once, tolerating invalid or cut-off UTF-8 sequences."""
+    return str(data, "utf-8", errors="replace")
+
+
+class _OutputProtocol(asyncio.SubprocessProtocol):
+    """Collects the shell's stdout and stderr straight into bytearrays as the pipes deliver them.
+
+    This skips the StreamReader layer, which would copy every chunk into its own buffer and
+    again into the bytes handed back by read().
+    """
+
+    def __init__(self, sentinel: bytes):
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self._sentinel = sentinel
+        self._scanned = 0  # stdout offset before which the sentinel cannot start
+        self._waiter: asyncio.Future[int] | None = None
+
+    def wait_for_sentinel(self) -> "asyncio.Future[int]":
+        """Return a future resolving to the sentinel's offset in stdout, or -1 if stdout closes first."""
+        self._waiter = asyncio.get_running_loop().create_future()
+        self._scan()
+        return self._waiter
+
+    def consume(self, end: int):
+        """Drop a finished command's output: stdout up to and including the sentinel at `end`, and all of stderr.
+
+        Anything stdout received after the sentinel (e.g. from a background job) stays
+        buffered for the next command instead of being thrown away.
+        """
+        if end == -1:
+            self.stdout.clear()
+        else:
+            del self.stdout[: end + len(self._sentinel)]
+        self.stderr.clear()
+        self._scanned = 0
+
+    def pipe_data_received(self, fd: int, data: bytes):
+        if fd == 1:
+            self.stdout += data
+            self._scan()
+        else:
+            self.stderr += data
+
+    def pipe_connection_lost(self, fd: int, exc: Exception | None):
+        if fd == 1 and self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(-1)
+
+    def _scan(self):
+        if self._waiter is None or self._waiter.done():
+            return
+        # only scan the new bytes, plus enough of the old tail to catch a split sentinel
+        idx = self.stdout.find(self._sentinel, self._scanned)
+        if idx == -1:
+            self._scanned = max(self._scanned, len(self.stdout) - len(self._sentinel) + 1)
+            return
+        self._waiter.set_result(idx)
+
+
 class _BashSession:
     """A session of a bash shell."""
 
     _started: bool
-    _process: asyncio.subprocess.Process
+    _transport: asyncio.SubprocessTransport
+    _protocol: _OutputProtocol
 
     command: str = "/bin/bash"
-    _output_delay: float = 0.2  # seconds
     _timeout: float = 30.0  # seconds (30 seconds)
-    _sentinel: str = "<<exit>>"
 
     def __init__(self):
         self._started = False
         self._timed_out = False
+        # unique per session, so command output that happens to contain a sentinel-like string
+        # can never end a command early
+        self._sentinel = f"<<exit-{uuid.uuid4().hex}>>"
+        self._sentinel_bytes = f"{self._sentinel}\n".encode()
 
     async def start(self):
         if self._started:
@@ -31,11 +95,10 @@ class _BashSession:
             os.setgid(1000)
             os.setuid(1000)
 
-        self._process = await asyncio.create_subprocess_shell(
+        self._transport, self._protocol = await asyncio.get_running_loop().subprocess_shell(
+            lambda: _OutputProtocol(self._sentinel_bytes),
             self.command,
             preexec_fn=demote,
-            shell=True,
-            bufsize=0,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
@@ -47,64 +110,58 @@ class _BashSession:
         """Terminate the bash shell."""
         if not self._started:
             raise ToolError("Session has not started.")
-        if self._process.returncode is not None:
+        if self._transport.get_returncode() is not None:
             return
-        self._process.terminate()
+        self._transport.terminate()
 
     async def run(self, command: str):
         """Execute a command in the bash shell."""
         if not self._started:
             raise ToolError("Session has not started.")
-        if self._process.returncode is not None:
+        returncode = self._transport.get_returncode()
+        if returncode is not None:
             await asyncio.sleep(0)
             return ToolResult(
                 system="tool must be restarted",
-                error=f"bash has exited with returncode {self._process.returncode}",
+                error=f"bash has exited with returncode {returncode}",
             )
         if self._timed_out:
             raise ToolError(
                 f"timed out: bash has not returned in {self._timeout} seconds and must be restarted.",
             )
 
-        # we know these are not None because we created the process with PIPEs
-        assert self._process.stdin
-        assert self._process.stdout
-        assert self._process.stderr
+        stdin = self._transport.get_pipe_transport(0)
+        # we know this is not None because we created the process with PIPEs
+        assert isinstance(stdin, asyncio.WriteTransport)
+
+        # the protocol wakes us up as soon as the sentinel arrives, so there is no polling delay per command
+        sentinel_found = self._protocol.wait_for_sentinel()
 
         # send command to the process
-        self._process.stdin.write(command.encode() + f"; echo '{self._sentinel}'\n".encode())
-        await self._process.stdin.drain()
+        stdin.write(command.encode() + f"; echo '{self._sentinel}'\n".encode())
 
-        # read output from the process, until the sentinel is found
+        stdout_buf = self._protocol.stdout
         try:
             async with asyncio.timeout(self._timeout):
-                while True:
-                    await asyncio.sleep(self._output_delay)
-                    # if we read directly from stdout/stderr, it will wait forever for
-                    # EOF. use the StreamReader buffer directly instead.
-                    output = self._process.stdout._buffer.decode()  # pyright: ignore[reportAttributeAccessIssue]
-                    error = self._process.stderr._buffer.decode()  # pyright: ignore[reportAttributeAccessIssue]
-                    if self._sentinel in output:
-                        # strip the sentinel and break
-                        output = output[: output.index(self._sentinel)]
-                        break
+                end = await sentinel_found
         except TimeoutError:
             self._timed_out = True
-            stdout_truncated = output[:10000] + "<response clipped>" if len(output) > 10000 else output
-            stderr_truncated = error[:10000] + "<response clipped>" if len(error) > 10000 else error
+            error_buf = self._protocol.stderr
+            stdout_truncated = _decode(stdout_buf[:10000]) + "<response clipped>" if len(stdout_buf) > 10000 else _decode(stdout_buf)
+            stderr_truncated = _decode(error_buf[:10000]) + "<response clipped>" if len(error_buf) > 10000 else _decode(error_buf)
             
             # Save full stdout and stderr to temporary files
             stdout_file = None
             stderr_file = None
             
             try:
-                # Create temporary files for stdout and stderr
-                with tempfile.NamedTemporaryFile(mode='w', prefix='bash_stdout_', suffix='.log', delete=False) as f:
-                    f.write(output)
+                # Create temporary files for stdout and stderr, writing the raw bytes as received
+                with tempfile.NamedTemporaryFile(mode='wb', prefix='bash_stdout_', suffix='.log', delete=False) as f:
+                    f.write(stdout_buf)
                     stdout_file = f.name
                 
-                with tempfile.NamedTemporaryFile(mode='w', prefix='bash_stderr_', suffix='.log', delete=False) as f:
-                    f.write(error)
+                with tempfile.NamedTemporaryFile(mode='wb', prefix='bash_stderr_', suffix='.log', delete=False) as f:
+                    f.write(error_buf)
                     stderr_file = f.name
                 
                 raise ToolError(
@@ -122,16 +179,19 @@ class _BashSession:
                     f"timed out: bash has not returned in {self._timeout} seconds and must be restarted. Full logs are saved to \n STDOUT: {stdout_truncated}\n STDERR: {stderr_truncated}",
                 ) from None
 
+        # stderr that reached the pipe together with the sentinel was handed to the protocol
+        # in the same event loop pass, before this coroutine resumed
+        with memoryview(stdout_buf) as view:
+            output = _decode(view if end == -1 else view[:end])
+        error = _decode(self._protocol.stderr)
+        self._protocol.consume(end)
+
         if output.endswith("\n"):
             output = output[:-1]
 
         if error.endswith("\n"):
             error = error[:-1]
 
-        # clear the buffers so that the next output can be read correctly
-        self._process.stdout._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-        self._process.stderr._buffer.clear()  # pyright: ignore[reportAttributeAccessIssue]
-
         return CLIResult(output=output, error=error)
 
 
@@ -110,7 +110,7 @@ def merge_junits(junit_xmls: list[str]) -> tuple[str, bool]:
                         pass
                         
         except ET.ParseError as e:
-            logger.warning(f"Failed to parse JUnit XML: {e}")
+            logger.warning("Failed to parse JUnit XML: %s", e)
             continue
     
     # Add aggregate attributes to root (optional but useful)